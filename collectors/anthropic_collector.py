@@ -1,12 +1,38 @@
 """Anthropic API usage collector."""
 
 from datetime import datetime, timezone
-from typing import List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Optional
 import httpx
+import orjson
 
-from .base import BaseCollector, TokenUsagePoint
+from .base import BaseCollector, TokenUsagePoint, parse_iso_timestamp
 from .config import settings
 
+_API_TAGS = MappingProxyType({"source": "api"})
+
+
+@lru_cache(maxsize=256)
+def _resolve_anthropic_pricing(model: str) -> Optional[dict]:
+    """Resolve pricing for a model name, or None if the model is unknown."""
+    model_lower = model.lower()
+    
+    for known_model, pricing in AnthropicCollector.MODELS_PRICING.items():
+        if known_model in model_lower or model_lower in known_model:
+            return pricing
+    
+    return None
+
+
+@lru_cache(maxsize=256)
+def _resolve_anthropic_token_pricing(model: str) -> Optional[dict]:
+    """Per-token pricing for a model name, or None if the model is unknown."""
+    pricing = _resolve_anthropic_pricing(model)
+    if pricing is None:
+        return None
+    return {key: price / 1_000_000 for key, price in pricing.items()}
+
 
 class AnthropicCollector(BaseCollector):
     """Collects usage data from Anthropic API."""
@@ -26,6 +52,7 @@ class AnthropicCollector(BaseCollector):
         "claude-2.0": {"input": 8.00, "output": 24.00},
         "claude-instant-1.2": {"input": 0.80, "output": 2.40},
     }
+    DEFAULT_PRICING = {"input": 3.00, "output": 15.00}  # Sonnet pricing
     
     def is_configured(self) -> bool:
         """Check if Anthropic API key is configured."""
@@ -33,23 +60,21 @@ class AnthropicCollector(BaseCollector):
     
     def get_model_pricing(self, model: str) -> dict:
         """Get pricing for a model."""
-        # Normalize model name
-        model_lower = model.lower()
-        
-        for known_model, pricing in self.MODELS_PRICING.items():
-            if known_model in model_lower or model_lower in known_model:
-                return pricing
+        pricing = _resolve_anthropic_pricing(model)
+        if pricing is not None:
+            return pricing
         
         # Default fallback
         self.log.warning("Unknown Anthropic model", model=model)
-        return {"input": 3.00, "output": 15.00}  # Default to Sonnet pricing
+        return self.DEFAULT_PRICING
     
     def calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
         """Calculate cost in USD for token usage."""
-        pricing = self.get_model_pricing(model)
-        input_cost = (input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        return round(input_cost + output_cost, 6)
+        pricing = _resolve_anthropic_token_pricing(model)
+        if pricing is None:
+            per_1m = self.get_model_pricing(model)
+            pricing = {key: price / 1_000_000 for key, price in per_1m.items()}
+        return round(input_tokens * pricing["input"] + output_tokens * pricing["output"], 6)
     
     async def collect(self) -> List[TokenUsagePoint]:
         """Collect usage data from Anthropic."""
@@ -62,34 +87,32 @@ class AnthropicCollector(BaseCollector):
         # 3. Parse usage from Console/Dashboard (web scraping)
         
         # For now, we'll check if there's a usage endpoint
-        async with httpx.AsyncClient() as client:
-            try:
-                # Try the admin API (beta)
-                response = await client.get(
-                    "https://api.anthropic.com/v1/usage",
-                    headers={
-                        "x-api-key": settings.anthropic_api_key,
-                        "anthropic-version": "2024-01-01",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=30.0
+        try:
+            # Try the admin API (beta)
+            response = await self.http.get(
+                "https://api.anthropic.com/v1/usage",
+                headers={
+                    "x-api-key": settings.anthropic_api_key,
+                    "anthropic-version": "2024-01-01",
+                    "Content-Type": "application/json"
+                }
+            )
+            
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                points.extend(self._parse_usage_response(data))
+            elif response.status_code == 404:
+                self.log.debug("Anthropic usage API not available")
+            else:
+                self.log.debug(
+                    "Anthropic API response",
+                    status=response.status_code
                 )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    points.extend(self._parse_usage_response(data))
-                elif response.status_code == 404:
-                    self.log.debug("Anthropic usage API not available")
-                else:
-                    self.log.debug(
-                        "Anthropic API response",
-                        status=response.status_code
-                    )
-                    
-            except httpx.TimeoutException:
-                self.log.error("Anthropic API timeout")
-            except Exception as e:
-                self.log.debug("Anthropic collection skipped", reason=str(e))
+        except httpx.TimeoutException:
+            self.log.error("Anthropic API timeout")
+        except Exception as e:
+            self.log.debug("Anthropic collection skipped", reason=str(e))
         
         return points
     
@@ -109,7 +132,7 @@ class AnthropicCollector(BaseCollector):
             timestamp_str = item.get("timestamp")
             if timestamp_str:
                 try:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+                    timestamp = parse_iso_timestamp(timestamp_str)
                 except:
                     timestamp = datetime.now(timezone.utc)
             else:
@@ -124,7 +147,7 @@ class AnthropicCollector(BaseCollector):
                 output_tokens=output_tokens,
                 cost_usd=cost,
                 timestamp=timestamp,
-                tags={"source": "api"}
+                tags=_API_TAGS
             ))
         
         return points
@@ -1,20 +1,120 @@
 """Base collector class for Token Dashboard."""
 
+import math
+import threading
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Mapping, Optional, Tuple
+import httpx
 import structlog
-from influxdb_client import InfluxDBClient, Point, WriteOptions
-from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client import InfluxDBClient, Point, WriteOptions, WritePrecision
 
 from .config import settings
 
 logger = structlog.get_logger()
 
+MEASUREMENT = "token_usage"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MS = timedelta(milliseconds=1)
+
+# Line protocol escaping for tag keys/values and field keys
+_KEY_ESCAPE = str.maketrans({
+    ",": "\\,", " ": "\\ ", "=": "\\=",
+    "\n": "\\n", "\r": "\\r", "\t": "\\t",
+})
+# Line protocol escaping for string field values
+_STRING_ESCAPE = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+
+def parse_iso_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, accepting a trailing 'Z' for UTC."""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _on_write_error(conf: Tuple[str, str, str], data: Any, exception: Exception) -> None:
+    """Log a batch the background writer gave up on."""
+    bucket, org, precision = conf
+    logger.error(
+        "Failed to write points to InfluxDB",
+        bucket=bucket,
+        batch_bytes=len(data),
+        error=str(exception)
+    )
+
+
+def _on_write_retry(conf: Tuple[str, str, str], data: Any, exception: Exception) -> None:
+    """Log a batch write that failed and will be retried."""
+    bucket, org, precision = conf
+    logger.warning(
+        "Retrying InfluxDB write",
+        bucket=bucket,
+        batch_bytes=len(data),
+        error=str(exception)
+    )
+
+
+_influx_lock = threading.Lock()
+_influx: Optional[Tuple[InfluxDBClient, Any]] = None
+
+
+def get_influx_write_api() -> Tuple[InfluxDBClient, Any]:
+    """Return the process-wide InfluxDB client and batching write API.
+    
+    All collectors share one connection pool and one write buffer, so
+    points from every collector are coalesced into the same batches.
+    """
+    global _influx
+    with _influx_lock:
+        if _influx is None:
+            client = InfluxDBClient(
+                url=settings.influxdb_url,
+                token=settings.influxdb_token,
+                org=settings.influxdb_org,
+                enable_gzip=True
+            )
+            # Batch points in the background instead of one blocking
+            # HTTP round trip per write_points() call. Points are flushed
+            # once a batch fills up or the flush interval elapses.
+            write_api = client.write_api(
+                write_options=WriteOptions(
+                    batch_size=settings.influxdb_batch_size,
+                    flush_interval=settings.influxdb_flush_interval,
+                    jitter_interval=1_000,
+                    retry_interval=5_000,
+                    max_retries=3
+                ),
+                # Writes happen on a background thread, so failures never
+                # reach write_points(); surface them in the logs instead
+                error_callback=_on_write_error,
+                retry_callback=_on_write_retry
+            )
+            _influx = (client, write_api)
+        return _influx
+
+
+def shutdown() -> None:
+    """Flush buffered points and close the shared InfluxDB client."""
+    global _influx
+    with _influx_lock:
+        if _influx is not None:
+            client, write_api = _influx
+            write_api.close()
+            client.close()
+            _influx = None
+
 
 class TokenUsagePoint:
     """Represents a single token usage data point."""
     
+    # One instance per message during large ingests; skip the per-instance __dict__
+    __slots__ = (
+        "provider", "model", "input_tokens", "output_tokens", "total_tokens",
+        "cost_usd", "timestamp", "tags", "fields"
+    )
+    
     def __init__(
         self,
         provider: str,
@@ -24,7 +124,7 @@ class TokenUsagePoint:
         total_tokens: int = 0,
         cost_usd: float = 0.0,
         timestamp: Optional[datetime] = None,
-        tags: Optional[Dict[str, str]] = None,
+        tags: Optional[Mapping[str, str]] = None,
         fields: Optional[Dict[str, Any]] = None
     ):
         self.provider = provider
@@ -37,26 +137,81 @@ class TokenUsagePoint:
         self.tags = tags or {}
         self.fields = fields or {}
     
+    def _sorted_tags(self) -> List[Tuple[str, str]]:
+        """All tags in lexicographic key order (the canonical series key order)."""
+        tags = {"provider": self.provider, "model": self.model, **self.tags}
+        return sorted(tags.items())
+    
+    def _sorted_fields(self) -> List[Tuple[str, Any]]:
+        """All fields in lexicographic key order."""
+        fields = {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+            "cost_usd": self.cost_usd,
+            **self.fields
+        }
+        return sorted(fields.items())
+    
+    def _epoch_ms(self) -> int:
+        """Timestamp in epoch milliseconds; naive datetimes are taken as UTC.
+        
+        Claude Code messages carry millisecond timestamps, and messages of
+        one session share a series key, so coarser precision would make
+        InfluxDB overwrite messages sent within the same second.
+        """
+        timestamp = self.timestamp
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return (timestamp - _EPOCH) // _ONE_MS
+    
     def to_influx_point(self) -> Point:
         """Convert to InfluxDB Point."""
-        point = (
-            Point("token_usage")
-            .tag("provider", self.provider)
-            .tag("model", self.model)
-            .field("input_tokens", self.input_tokens)
-            .field("output_tokens", self.output_tokens)
-            .field("total_tokens", self.total_tokens)
-            .field("cost_usd", self.cost_usd)
-            .time(self.timestamp)
-        )
+        point = Point(MEASUREMENT)
         
-        for key, value in self.tags.items():
+        for key, value in self._sorted_tags():
             point = point.tag(key, value)
         
-        for key, value in self.fields.items():
+        for key, value in self._sorted_fields():
             point = point.field(key, value)
         
-        return point
+        return point.time(self._epoch_ms(), WritePrecision.MS)
+    
+    def to_line_protocol(self) -> str:
+        """Convert to a line protocol string with a millisecond timestamp.
+        
+        Cheaper than building a Point for every sample; follows the same
+        escaping and type rules as the influxdb-client Point serializer.
+        """
+        tags = []
+        for key, value in self._sorted_tags():
+            if value is None or value == "":
+                continue
+            value = str(value).translate(_KEY_ESCAPE)
+            if value.endswith("\\"):
+                value += " "
+            tags.append(f",{key.translate(_KEY_ESCAPE)}={value}")
+        
+        fields = []
+        for key, value in self._sorted_fields():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            elif isinstance(value, int):
+                value = f"{value}i"
+            elif isinstance(value, float):
+                if not math.isfinite(value):
+                    continue
+                value = repr(value)
+                # Whole floats don't need the trailing ".0"
+                if value.endswith(".0"):
+                    value = value[:-2]
+            else:
+                value = f'"{str(value).translate(_STRING_ESCAPE)}"'
+            fields.append(f"{key.translate(_KEY_ESCAPE)}={value}")
+        
+        return f"{MEASUREMENT}{''.join(tags)} {','.join(fields)} {self._epoch_ms()}"
 
 
 class BaseCollector(ABC):
@@ -65,20 +220,23 @@ class BaseCollector(ABC):
     def __init__(self):
         self.name = self.__class__.__name__
         self.log = logger.bind(collector=self.name)
-        self._influx_client: Optional[InfluxDBClient] = None
-        self._write_api = None
+        self._http: Optional[httpx.AsyncClient] = None
     
     @property
     def influx_client(self) -> InfluxDBClient:
-        """Lazy-load InfluxDB client."""
-        if self._influx_client is None:
-            self._influx_client = InfluxDBClient(
-                url=settings.influxdb_url,
-                token=settings.influxdb_token,
-                org=settings.influxdb_org
+        """The InfluxDB client shared by all collectors."""
+        return get_influx_write_api()[0]
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Lazy-load a shared HTTP client, reused across collection cycles."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=30.0,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20)
             )
-            self._write_api = self._influx_client.write_api(write_options=SYNCHRONOUS)
-        return self._influx_client
+        return self._http
     
     @abstractmethod
     def is_configured(self) -> bool:
@@ -91,21 +249,28 @@ class BaseCollector(ABC):
         pass
     
     def write_points(self, points: List[TokenUsagePoint]) -> None:
-        """Write data points to InfluxDB."""
+        """Queue data points on the batching InfluxDB write API.
+        
+        This does not block on the network; the write API coalesces points
+        from successive cycles and flushes them from a background thread.
+        Failed flushes are logged by _on_write_error(), not raised here.
+        """
         if not points:
             self.log.debug("No points to write")
             return
         
         try:
-            influx_points = [p.to_influx_point() for p in points]
-            self._write_api.write(
+            lines = [p.to_line_protocol() for p in points]
+            write_api = get_influx_write_api()[1]
+            write_api.write(
                 bucket=settings.influxdb_bucket,
                 org=settings.influxdb_org,
-                record=influx_points
+                record=lines,
+                write_precision=WritePrecision.MS
             )
-            self.log.info("Wrote points to InfluxDB", count=len(points))
+            self.log.info("Queued points for InfluxDB", count=len(points))
         except Exception as e:
-            self.log.error("Failed to write points", error=str(e))
+            self.log.error("Failed to queue points", error=str(e))
             raise
     
     async def run(self) -> None:
@@ -123,6 +288,15 @@ class BaseCollector(ABC):
             self.log.error("Collection failed", error=str(e))
     
     def close(self) -> None:
-        """Clean up resources."""
-        if self._influx_client:
-            self._influx_client.close()
+        """Clean up resources.
+        
+        The InfluxDB client is shared, so it is closed by shutdown() instead.
+        """
+        pass
+    
+    async def aclose(self) -> None:
+        """Clean up resources, including the shared HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self.close()
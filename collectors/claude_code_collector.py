@@ -6,14 +6,107 @@ Scrapes usage data directly from Claude Code CLI's internal JSON files:
 - ~/.claude/history.jsonl - Command history (for context)
 """
 
+import asyncio
 import json
 import os
+import re
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Set
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 import hashlib
+import orjson
 
-from .base import BaseCollector, TokenUsagePoint
+from .base import BaseCollector, TokenUsagePoint, parse_iso_timestamp
+from .config import settings
+
+# Date suffixes like -20251101
+_DATE_SUFFIX_RE = re.compile(r'-\d{8}$')
+
+# Read-only tag sets shared by every point of the same kind
+_AGGREGATE_TAGS = MappingProxyType({
+    "source": "claude-code",
+    "subscription": "claude-max",
+    "data_type": "aggregate"
+})
+_DAILY_ACTIVITY_TAGS = MappingProxyType({
+    "source": "claude-code",
+    "data_type": "daily_activity"
+})
+
+
+@lru_cache(maxsize=256)
+def _resolve_claude_pricing(model: str) -> Optional[Dict[str, float]]:
+    """Resolve pricing for a model name, or None if the model is unknown."""
+    model_lower = model.lower()
+    
+    for known_model, pricing in ClaudeCodeCollector.MODELS_PRICING.items():
+        if known_model in model_lower or model_lower.startswith(known_model.split("-")[0]):
+            return pricing
+    
+    return None
+
+
+def _per_token(pricing: Dict[str, float]) -> Dict[str, float]:
+    """Convert USD per 1M tokens pricing to USD per token."""
+    return {key: price / 1_000_000 for key, price in pricing.items()}
+
+
+@lru_cache(maxsize=256)
+def _resolve_claude_token_pricing(model: str) -> Optional[Dict[str, float]]:
+    """Per-token pricing for a model name, or None if the model is unknown."""
+    pricing = _resolve_claude_pricing(model)
+    return _per_token(pricing) if pricing is not None else None
+
+
+def _hypothetical_cost(
+    pricing: Dict[str, float],
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0
+) -> float:
+    """Cost in USD of token usage at the given per-token pricing."""
+    return round(
+        input_tokens * pricing["input"]
+        + output_tokens * pricing["output"]
+        + cache_read_tokens * pricing["cache_read"]
+        + cache_write_tokens * pricing["cache_write"],
+        6
+    )
+
+
+@lru_cache(maxsize=128)
+def _normalize_model_name(model: str) -> str:
+    """Normalize model names for consistent tagging."""
+    return _DATE_SUFFIX_RE.sub('', model).lower()
+
+
+def _iter_jsonl(root: str) -> Iterator[str]:
+    """Yield paths of all .jsonl files under root.
+    
+    Uses os.scandir with the cached dirent type instead of Path.rglob,
+    avoiding a Path object and stat() per directory entry. Symlinked
+    files are yielded as rglob did; symlinked directories are not followed.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".jsonl") and entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def _session_id(jsonl_path: str) -> str:
+    """Session ID of a session file (its file name without extension)."""
+    return os.path.splitext(os.path.basename(jsonl_path))[0]
 
 
 class ClaudeCodeCollector(BaseCollector):
@@ -37,6 +130,14 @@ class ClaudeCodeCollector(BaseCollector):
         "claude-3-opus": {"input": 15.00, "output": 75.00, "cache_read": 1.875, "cache_write": 18.75},
         "claude-3-5-haiku": {"input": 0.80, "output": 4.00, "cache_read": 0.08, "cache_write": 1.00},
     }
+    # Opus pricing is used for unknown models
+    DEFAULT_PRICING = {"input": 15.00, "output": 75.00, "cache_read": 1.875, "cache_write": 18.75}
+    
+    # Number of processed message UUIDs remembered across runs
+    MAX_PROCESSED_UUIDS = 10_000
+    # Fraction of settings.collector_timeout spent parsing session files;
+    # the rest is headroom for merging and saving state
+    SESSION_PARSE_BUDGET = 0.75
     
     def __init__(self):
         super().__init__()
@@ -46,8 +147,15 @@ class ClaudeCodeCollector(BaseCollector):
         
         # State file to track what we've already processed
         self.state_file = Path.home() / ".claude" / "token_dash_state.json"
-        self._processed_uuids: Set[str] = set()
+        # Insertion-ordered so the oldest UUIDs can be evicted first
+        self._processed_uuids: "OrderedDict[str, None]" = OrderedDict()
         self._last_stats_hash: Optional[str] = None
+        # Per-file {"size", "mtime_ns", "offset"} so unchanged files are skipped
+        # and changed ones are read from where the last run stopped
+        self._file_offsets: Dict[str, Dict[str, int]] = {}
+        # Last assistant message UUID per session, used to skip the already
+        # processed prefix when a file has to be re-read from the start
+        self._session_cursors: Dict[str, str] = {}
         self._load_state()
     
     def _load_state(self) -> None:
@@ -56,21 +164,45 @@ class ClaudeCodeCollector(BaseCollector):
             if self.state_file.exists():
                 with open(self.state_file, "r") as f:
                     state = json.load(f)
-                    self._processed_uuids = set(state.get("processed_uuids", []))
+                    self._processed_uuids = OrderedDict.fromkeys(state.get("processed_uuids", []))
                     self._last_stats_hash = state.get("last_stats_hash")
+                    self._file_offsets = state.get("file_offsets", {})
+                    self._session_cursors = state.get("session_cursors", {})
                     self.log.debug("Loaded state", processed_count=len(self._processed_uuids))
         except Exception as e:
             self.log.warning("Failed to load state", error=str(e))
-            self._processed_uuids = set()
+            self._processed_uuids = OrderedDict()
+            self._file_offsets = {}
+            self._session_cursors = {}
+    
+    def _commit_state(
+        self,
+        stats_hash: Optional[str],
+        new_uuids: Dict[str, None],
+        file_offsets: Dict[str, Dict[str, int]],
+        session_cursors: Dict[str, str]
+    ) -> None:
+        """Apply the state built by a finished cycle and save it."""
+        if stats_hash is not None:
+            self._last_stats_hash = stats_hash
+        for uuid in new_uuids:
+            self._processed_uuids[uuid] = None
+        while len(self._processed_uuids) > self.MAX_PROCESSED_UUIDS:
+            self._processed_uuids.popitem(last=False)
+        self._file_offsets = file_offsets
+        self._session_cursors = session_cursors
+        self._save_state()
     
     def _save_state(self) -> None:
         """Save processed UUIDs to state file."""
         try:
-            # Keep only last 10000 UUIDs to prevent unbounded growth
-            uuids_to_save = list(self._processed_uuids)[-10000:]
+            # Already capped at MAX_PROCESSED_UUIDS, ordered oldest to newest
+            uuids_to_save = list(self._processed_uuids)
             state = {
                 "processed_uuids": uuids_to_save,
                 "last_stats_hash": self._last_stats_hash,
+                "file_offsets": self._file_offsets,
+                "session_cursors": self._session_cursors,
                 "last_updated": datetime.now(timezone.utc).isoformat()
             }
             with open(self.state_file, "w") as f:
@@ -84,15 +216,22 @@ class ClaudeCodeCollector(BaseCollector):
     
     def get_model_pricing(self, model: str) -> Dict[str, float]:
         """Get pricing for a model."""
-        model_lower = model.lower()
-        
-        for known_model, pricing in self.MODELS_PRICING.items():
-            if known_model in model_lower or model_lower.startswith(known_model.split("-")[0]):
-                return pricing
+        pricing = _resolve_claude_pricing(model)
+        if pricing is not None:
+            return pricing
         
         # Default to opus pricing for unknown models
         self.log.debug("Unknown model, using default pricing", model=model)
-        return {"input": 15.00, "output": 75.00, "cache_read": 1.875, "cache_write": 18.75}
+        return self.DEFAULT_PRICING
+    
+    def get_token_pricing(self, model: str) -> Dict[str, float]:
+        """Get pricing for a model in USD per token."""
+        pricing = _resolve_claude_token_pricing(model)
+        if pricing is not None:
+            return pricing
+        
+        self.log.debug("Unknown model, using default pricing", model=model)
+        return _per_token(self.DEFAULT_PRICING)
     
     def calculate_cost(
         self,
@@ -103,14 +242,10 @@ class ClaudeCodeCollector(BaseCollector):
         cache_write_tokens: int = 0
     ) -> float:
         """Calculate hypothetical cost in USD (Claude Max users pay $0)."""
-        pricing = self.get_model_pricing(model)
-        
-        input_cost = (input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        cache_read_cost = (cache_read_tokens / 1_000_000) * pricing["cache_read"]
-        cache_write_cost = (cache_write_tokens / 1_000_000) * pricing["cache_write"]
-        
-        return round(input_cost + output_cost + cache_read_cost + cache_write_cost, 6)
+        return _hypothetical_cost(
+            self.get_token_pricing(model), input_tokens, output_tokens,
+            cache_read_tokens, cache_write_tokens
+        )
     
     async def collect(self) -> List[TokenUsagePoint]:
         """Collect usage data from Claude Code internal files."""
@@ -121,38 +256,42 @@ class ClaudeCodeCollector(BaseCollector):
             return points
         
         # 1. Collect aggregated stats from stats-cache.json
-        stats_points = self._collect_from_stats_cache()
+        stats_points, stats_hash = self._collect_from_stats_cache()
         points.extend(stats_points)
         
         # 2. Collect detailed per-message usage from session files
-        session_points = self._collect_from_sessions()
+        session_points, new_uuids, file_offsets, session_cursors = await self._collect_from_sessions()
         points.extend(session_points)
         
-        # Save state for incremental processing
-        self._save_state()
+        # Only advance the state once nothing is left to await, so a cycle
+        # cancelled above leaves it untouched and re-sends everything next time.
+        # Saved synchronously for the same reason; the file is small.
+        self._commit_state(stats_hash, new_uuids, file_offsets, session_cursors)
         
         return points
     
-    def _collect_from_stats_cache(self) -> List[TokenUsagePoint]:
-        """Collect aggregated stats from stats-cache.json."""
+    def _collect_from_stats_cache(self) -> Tuple[List[TokenUsagePoint], Optional[str]]:
+        """Collect aggregated stats from stats-cache.json.
+        
+        Returns the points and the hash of the stats they were built from,
+        or None for the hash if nothing new was read.
+        """
         points = []
+        stats_hash = None
         
         if not self.stats_cache_path.exists():
             self.log.debug("stats-cache.json not found")
-            return points
+            return points, None
         
         try:
-            with open(self.stats_cache_path, "r") as f:
-                content = f.read()
-                stats = json.loads(content)
+            content = self.stats_cache_path.read_bytes()
+            stats = orjson.loads(content)
             
             # Check if stats have changed
-            content_hash = hashlib.md5(content.encode()).hexdigest()
+            content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
             if content_hash == self._last_stats_hash:
                 self.log.debug("stats-cache unchanged, skipping")
-                return points
-            
-            self._last_stats_hash = content_hash
+                return points, None
             
             # Extract model usage totals
             model_usage = stats.get("modelUsage", {})
@@ -171,16 +310,12 @@ class ClaudeCodeCollector(BaseCollector):
                 # Create aggregate point with custom measurement
                 points.append(TokenUsagePoint(
                     provider="anthropic",
-                    model=self._normalize_model_name(model_name),
+                    model=_normalize_model_name(model_name),
                     input_tokens=input_tokens,
                     output_tokens=output_tokens,
                     cost_usd=0.0,  # Claude Max is subscription-based
                     timestamp=datetime.now(timezone.utc),
-                    tags={
-                        "source": "claude-code",
-                        "subscription": "claude-max",
-                        "data_type": "aggregate"
-                    },
+                    tags=_AGGREGATE_TAGS,
                     fields={
                         "cache_read_tokens": cache_read,
                         "cache_write_tokens": cache_write,
@@ -204,10 +339,7 @@ class ClaudeCodeCollector(BaseCollector):
                             output_tokens=0,
                             cost_usd=0.0,
                             timestamp=date,
-                            tags={
-                                "source": "claude-code",
-                                "data_type": "daily_activity"
-                            },
+                            tags=_DAILY_ACTIVITY_TAGS,
                             fields={
                                 "message_count": daily.get("messageCount", 0),
                                 "session_count": daily.get("sessionCount", 0),
@@ -217,53 +349,143 @@ class ClaudeCodeCollector(BaseCollector):
                     except ValueError:
                         continue
             
+            stats_hash = content_hash
             self.log.info("Collected stats from stats-cache.json", model_count=len(model_usage))
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             self.log.error("Failed to parse stats-cache.json", error=str(e))
         except Exception as e:
             self.log.error("Error reading stats-cache.json", error=str(e))
         
-        return points
+        return points, stats_hash
     
-    def _collect_from_sessions(self) -> List[TokenUsagePoint]:
-        """Collect detailed per-message usage from session JSONL files."""
+    async def _collect_from_sessions(self) -> Tuple[
+        List[TokenUsagePoint], Dict[str, None], Dict[str, Dict[str, int]], Dict[str, str]
+    ]:
+        """Collect detailed per-message usage from session JSONL files.
+        
+        Returns the points along with the new message UUIDs, file offsets and
+        session cursors for ``_commit_state()``; collector state is not changed.
+        """
         points = []
+        new_uuids: Dict[str, None] = {}
         
         if not self.projects_dir.exists():
             self.log.debug("projects directory not found")
-            return points
+            return points, new_uuids, self._file_offsets, self._session_cursors
         
-        new_uuids_count = 0
+        # Parse all session JSONL files concurrently in worker threads
+        paths = list(_iter_jsonl(str(self.projects_dir)))
+        tasks = [
+            asyncio.ensure_future(asyncio.to_thread(
+                self._parse_session_file,
+                path,
+                self._file_offsets.get(path),
+                self._session_cursors.get(_session_id(path))
+            ))
+            for path in paths
+        ]
         
-        # Find all session JSONL files
-        for jsonl_path in self.projects_dir.rglob("*.jsonl"):
-            try:
-                session_points, new_count = self._parse_session_file(jsonl_path)
-                points.extend(session_points)
-                new_uuids_count += new_count
-            except Exception as e:
-                self.log.debug("Error parsing session file", path=str(jsonl_path), error=str(e))
+        # Stop waiting well inside the collector timeout and keep what has
+        # been parsed, so a large backlog makes progress across cycles
+        # instead of being cancelled and thrown away every time
+        pending = set()
+        if tasks:
+            budget = settings.collector_timeout * self.SESSION_PARSE_BUDGET
+            _, pending = await asyncio.wait(tasks, timeout=budget)
+            for task in pending:
+                # Drops files still queued; ones already running finish unused
+                task.cancel()
+            if pending:
+                self.log.info(
+                    "Session parse budget reached, deferring files to next cycle",
+                    parsed=len(tasks) - len(pending),
+                    deferred=len(pending)
+                )
         
-        if new_uuids_count > 0:
-            self.log.info("Collected new messages from sessions", new_messages=new_uuids_count)
+        # Merge on the event loop into locals; committed by collect().
+        # Offsets and cursors are rebuilt from the files seen this run, dropping deleted ones.
+        file_offsets = {}
+        session_cursors = {}
+        for jsonl_path, task in zip(paths, tasks):
+            session_id = _session_id(jsonl_path)
+            deferred = task in pending
+            error = None if deferred else task.exception()
+            if deferred or error is not None:
+                if error is not None:
+                    self.log.debug("Error parsing session file", path=jsonl_path, error=str(error))
+                if jsonl_path in self._file_offsets:
+                    file_offsets[jsonl_path] = self._file_offsets[jsonl_path]
+                if session_id in self._session_cursors:
+                    session_cursors[session_id] = self._session_cursors[session_id]
+                continue
+            
+            session_points, file_offsets[jsonl_path], cursor = task.result()
+            if cursor:
+                session_cursors[session_id] = cursor
+            for uuid, point in session_points:
+                # The same message can appear in more than one file (resumed sessions)
+                if uuid in self._processed_uuids or uuid in new_uuids:
+                    continue
+                new_uuids[uuid] = None
+                points.append(point)
         
-        return points
+        if new_uuids:
+            self.log.info("Collected new messages from sessions", new_messages=len(new_uuids))
+        
+        return points, new_uuids, file_offsets, session_cursors
     
-    def _parse_session_file(self, jsonl_path: Path) -> tuple[List[TokenUsagePoint], int]:
-        """Parse a single session JSONL file for assistant messages with usage data."""
+    def _parse_session_file(
+        self,
+        jsonl_path: str,
+        prev_offset: Optional[Dict[str, int]] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, TokenUsagePoint]], Dict[str, int], Optional[str]]:
+        """Parse a single session JSONL file for assistant messages with usage data.
+        
+        Runs in a worker thread, so it only reads ``_processed_uuids`` and
+        returns ``(uuid, point)`` pairs for the caller to merge, along with the
+        file's new size/mtime/offset fingerprint and session cursor.
+        """
         points = []
-        new_count = 0
         
-        with open(jsonl_path, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
+        st = os.stat(jsonl_path)
+        if (
+            prev_offset
+            and prev_offset.get("size") == st.st_size
+            and prev_offset.get("mtime_ns") == st.st_mtime_ns
+        ):
+            return points, prev_offset, cursor
+        
+        # Session files are append-only; start over if it was truncated or replaced
+        offset = prev_offset.get("offset", 0) if prev_offset else 0
+        if offset > st.st_size:
+            offset = 0
+        
+        # sessionId is constant within a session file; slice it once per file
+        session_tag = None
+        message_tags = None
+        # Sessions use a handful of models; resolve each one's pricing once
+        model_pricing: Dict[str, Dict[str, float]] = {}
+        
+        with open(jsonl_path, "rb") as f:
+            if offset == 0 and cursor:
+                # No usable offset (new path or rewritten file): everything up to
+                # the cursor message was already processed, so skip it unparsed
+                offset = self._find_cursor_offset(f, cursor)
+            f.seek(offset)
+            for raw in f:
+                line = raw.strip()
                 try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
+                    entry = orjson.loads(line) if line else None
+                except orjson.JSONDecodeError:
+                    if not raw.endswith(b"\n"):
+                        # Last line is still being written; re-read it next cycle
+                        break
+                    entry = None
+                offset += len(raw)
+                
+                if not isinstance(entry, dict):
                     continue
                 
                 # Only process assistant messages with usage data
@@ -271,12 +493,13 @@ class ClaudeCodeCollector(BaseCollector):
                     continue
                 
                 uuid = entry.get("uuid")
-                if not uuid or uuid in self._processed_uuids:
-                    continue
-                
                 message = entry.get("message", {})
                 usage = message.get("usage")
-                if not usage:
+                if not uuid or not usage:
+                    continue
+                
+                cursor = uuid
+                if uuid in self._processed_uuids:
                     continue
                 
                 # Extract token counts
@@ -294,39 +517,51 @@ class ClaudeCodeCollector(BaseCollector):
                 # Parse timestamp
                 timestamp_str = entry.get("timestamp")
                 try:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+                    timestamp = parse_iso_timestamp(timestamp_str)
                 except:
                     timestamp = datetime.now(timezone.utc)
                 
                 # Calculate hypothetical cost
-                cost = self.calculate_cost(
-                    model, input_tokens, output_tokens,
+                pricing = model_pricing.get(model)
+                if pricing is None:
+                    pricing = model_pricing[model] = self.get_token_pricing(model)
+                cost = _hypothetical_cost(
+                    pricing, input_tokens, output_tokens,
                     cache_read, cache_write
                 )
                 
-                # Determine content type
+                if session_tag is None:
+                    session_tag = entry.get("sessionId", "unknown")[:8]
+                    # Same tags for every message in the file
+                    message_tags = MappingProxyType({
+                        "source": "claude-code",
+                        "subscription": "claude-max",
+                        "data_type": "message",
+                        "session_id": session_tag
+                    })
+                msg_id = message.get("id")
+                
+                # Determine content type, stopping once both flags are known
                 content = message.get("content", [])
-                content_types = set()
-                for item in content if isinstance(content, list) else []:
+                has_tool_use = has_thinking = False
+                for item in content if isinstance(content, list) else ():
                     if isinstance(item, dict):
-                        content_types.add(item.get("type", "unknown"))
+                        item_type = item.get("type")
+                        if item_type == "tool_use":
+                            has_tool_use = True
+                        elif item_type == "thinking":
+                            has_thinking = True
+                        if has_tool_use and has_thinking:
+                            break
                 
-                has_tool_use = "tool_use" in content_types
-                has_thinking = "thinking" in content_types
-                
-                points.append(TokenUsagePoint(
+                points.append((uuid, TokenUsagePoint(
                     provider="anthropic",
-                    model=self._normalize_model_name(model),
+                    model=_normalize_model_name(model),
                     input_tokens=input_tokens,
                     output_tokens=output_tokens,
                     cost_usd=0.0,  # Subscription-based
                     timestamp=timestamp,
-                    tags={
-                        "source": "claude-code",
-                        "subscription": "claude-max",
-                        "data_type": "message",
-                        "session_id": entry.get("sessionId", "unknown")[:8]
-                    },
+                    tags=message_tags,
                     fields={
                         "cache_read_tokens": cache_read,
                         "cache_write_tokens": cache_write,
@@ -336,23 +571,35 @@ class ClaudeCodeCollector(BaseCollector):
                         "service_tier": usage.get("service_tier", "standard"),
                         "has_tool_use": 1 if has_tool_use else 0,
                         "has_thinking": 1 if has_thinking else 0,
-                        "request_id": message.get("id", "")[:20] if message.get("id") else ""
+                        "request_id": msg_id[:20] if msg_id else ""
                     }
-                ))
-                
-                self._processed_uuids.add(uuid)
-                new_count += 1
+                )))
         
-        return points, new_count
+        return points, {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "offset": offset}, cursor
+    
+    @staticmethod
+    def _find_cursor_offset(f, cursor: str) -> int:
+        """Return the byte offset just past the entry with UUID ``cursor``, or 0."""
+        needle = cursor.encode()
+        offset = 0
+        for raw in f:
+            offset += len(raw)
+            # Cheap substring test first; only decode candidate lines
+            if needle not in raw:
+                continue
+            try:
+                entry = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and entry.get("uuid") == cursor:
+                return offset
+        return 0
     
-    def _normalize_model_name(self, model: str) -> str:
-        """Normalize model names for consistent tagging."""
-        # Remove date suffixes like -20251101
-        import re
-        normalized = re.sub(r'-\d{8}$', '', model)
-        return normalized.lower()
+    def _read_stats_sync(self) -> Dict[str, Any]:
+        """Read and decode stats-cache.json."""
+        return orjson.loads(self.stats_cache_path.read_bytes())
     
-    def get_summary(self) -> Dict[str, Any]:
+    async def get_summary(self) -> Dict[str, Any]:
         """Get a summary of Claude Code usage (useful for dashboards)."""
         summary = {
             "configured": self.is_configured(),
@@ -363,8 +610,7 @@ class ClaudeCodeCollector(BaseCollector):
         
         if self.stats_cache_path.exists():
             try:
-                with open(self.stats_cache_path, "r") as f:
-                    stats = json.load(f)
+                stats = await asyncio.to_thread(self._read_stats_sync)
                 summary["total_sessions"] = stats.get("totalSessions", 0)
                 summary["total_messages"] = stats.get("totalMessages", 0)
                 summary["first_session_date"] = stats.get("firstSessionDate")
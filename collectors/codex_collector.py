@@ -2,11 +2,38 @@
 
 import asyncio
 import re
+import shutil
+import time
 from datetime import datetime, timezone
-from typing import List, Optional
+from types import MappingProxyType
+from typing import List, Optional, Tuple
 
 from .base import BaseCollector, TokenUsagePoint
 
+_CODEX_TAGS = MappingProxyType({"source": "codex-cli", "subscription": "chatgpt-plus"})
+
+# Patterns like "X tokens used" or "Input: X, Output: Y". Whitespace runs
+# are always separated by literal text and a number can only start at the
+# beginning of a digit run, so a scan of large non-matching output stays
+# linear instead of backtracking. Each pattern is searched
+# separately: the matches can overlap (e.g. "Input: 1,200 tokens used"),
+# which a single alternation scan would lose.
+_TOTAL_RE = re.compile(r"(?<![\d.,])(\d[\d,]*)\s*(?:total\s*)?tokens?\s*used", re.IGNORECASE)
+_INPUT_RE = re.compile(r"(?:input|prompt)(?:\s*tokens?)?\s*(?::\s*)?(?<![\d.,])(\d[\d,]*)", re.IGNORECASE)
+_OUTPUT_RE = re.compile(r"(?:output|completion)(?:\s*tokens?)?\s*(?::\s*)?(?<![\d.,])(\d[\d,]*)", re.IGNORECASE)
+_PCT_RE = re.compile(r"(?<![\d.,])(\d+(?:\.\d+)?)\s*%\s*(?:used|of)", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"limit\s*(?::\s*)?(?<![\d.,])(\d[\d,]*)", re.IGNORECASE)
+
+# Most specific variants first so they win over their prefixes
+_MODEL_RE = re.compile(r"(gpt-4o-mini|gpt-4o|gpt-4-turbo|gpt-4|gpt-3\.5)", re.IGNORECASE)
+_MODEL_NAMES = {
+    "gpt-4o-mini": "gpt-4o-mini",
+    "gpt-4o": "gpt-4o",
+    "gpt-4-turbo": "gpt-4-turbo",
+    "gpt-4": "gpt-4",
+    "gpt-3.5": "gpt-3.5-turbo",
+}
+
 
 class CodexCollector(BaseCollector):
     """
@@ -16,14 +43,36 @@ class CodexCollector(BaseCollector):
     and parses the output to extract subscription usage data.
     """
     
+    # Sub-commands tried in order until one yields usage data
+    USAGE_COMMANDS = (
+        ["usage"],
+        ["--usage"],  # /usage within codex
+        ["status"],
+    )
+    # How long to stop trying after every sub-command failed
+    FAILURE_BACKOFF_SECONDS = 3600
+    # Usage summaries are short; anything past this is not worth scanning
+    MAX_OUTPUT_BYTES = 64 * 1024
+    
+    def __init__(self):
+        super().__init__()
+        # Resolved once so a missing CLI costs nothing per cycle
+        self._cli_path: Optional[str] = shutil.which("codex")
+        # Sub-command that last produced usage data
+        self._winning_cmd: Optional[List[str]] = None
+        self._failed_until: float = 0.0
+    
     def is_configured(self) -> bool:
         """Check if Codex CLI is available."""
-        return True
+        return self._cli_path is not None
     
     async def collect(self) -> List[TokenUsagePoint]:
         """Collect usage data from Codex CLI."""
         points = []
         
+        if not self._cli_path or time.monotonic() < self._failed_until:
+            return points
+        
         usage_data = await self._get_codex_usage()
         if usage_data:
             points.append(usage_data)
@@ -33,24 +82,25 @@ class CodexCollector(BaseCollector):
     async def _get_codex_usage(self) -> Optional[TokenUsagePoint]:
         """Run codex CLI and parse usage output."""
         try:
-            # Try running codex with usage command
-            result = await self._run_command(["codex", "usage"])
-            if result:
-                parsed = self._parse_usage_output(result)
-                if parsed:
-                    return parsed
-            
-            # Try /usage within codex
-            result = await self._run_command(["codex", "--usage"])
-            if result:
-                parsed = self._parse_usage_output(result)
+            # Once a sub-command has worked, only run that one
+            commands = [self._winning_cmd] if self._winning_cmd else self.USAGE_COMMANDS
+            for args in commands:
+                result = await self._run_command([self._cli_path, *args])
+                if not result:
+                    continue
+                if args == ["status"]:
+                    parsed = self._parse_status_output(result)
+                else:
+                    parsed = self._parse_usage_output(result)
                 if parsed:
+                    self._winning_cmd = args
                     return parsed
             
-            # Try status command
-            result = await self._run_command(["codex", "status"])
-            if result:
-                return self._parse_status_output(result)
+            if self._winning_cmd:
+                # Stopped working; try every sub-command again next cycle
+                self._winning_cmd = None
+            else:
+                self._failed_until = time.monotonic() + self.FAILURE_BACKOFF_SECONDS
             
             self.log.debug("No usage data from Codex CLI")
             return None
@@ -63,34 +113,74 @@ class CodexCollector(BaseCollector):
             return None
     
     async def _run_command(self, cmd: List[str], timeout: int = 10) -> Optional[str]:
-        """Run a command and return stdout."""
+        """Run a command and return at most MAX_OUTPUT_BYTES of its stdout."""
         try:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.DEVNULL
             )
             
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                # Reading and reaping share one deadline, so a CLI that
+                # closes stdout but never exits can't block the collector
+                stdout, truncated = await asyncio.wait_for(
+                    self._communicate_capped(process),
                     timeout=timeout
                 )
-                
-                if process.returncode == 0:
-                    return stdout.decode("utf-8", errors="ignore")
-                else:
-                    return None
-                    
             except asyncio.TimeoutError:
-                process.kill()
+                self._kill(process)
                 await process.wait()
                 return None
+            except asyncio.CancelledError:
+                # The collector itself timed out; don't leave codex running.
+                # The event loop's child watcher reaps it.
+                self._kill(process)
+                raise
+            
+            if truncated or process.returncode == 0:
+                return stdout.decode("utf-8", errors="ignore")
+            return None
                 
         except Exception as e:
             self.log.debug("Command failed", cmd=cmd, error=str(e))
             return None
     
+    async def _communicate_capped(self, process: asyncio.subprocess.Process) -> Tuple[bytes, bool]:
+        """Read capped stdout and wait for exit; returns (stdout, truncated)."""
+        stdout = await self._read_capped(process.stdout, self.MAX_OUTPUT_BYTES)
+        truncated = len(stdout) >= self.MAX_OUTPUT_BYTES
+        if truncated:
+            # Enough to parse; don't wait for the rest. The pipe still has
+            # to reach EOF before wait() returns, so discard what's left.
+            self._kill(process)
+            while await process.stdout.read(self.MAX_OUTPUT_BYTES):
+                pass
+        await process.wait()
+        return stdout, truncated
+    
+    @staticmethod
+    def _kill(process: asyncio.subprocess.Process) -> None:
+        """Kill a process unless it has already exited."""
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+    
+    @staticmethod
+    async def _read_capped(stream: asyncio.StreamReader, limit: int) -> bytes:
+        """Read from a stream until EOF or until limit bytes have been read."""
+        chunks = []
+        remaining = limit
+        while remaining > 0:
+            chunk = await stream.read(remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    
     def _parse_usage_output(self, output: str) -> Optional[TokenUsagePoint]:
         """Parse Codex CLI usage output."""
         input_tokens = 0
@@ -99,50 +189,37 @@ class CodexCollector(BaseCollector):
         used_pct = 0.0
         model = "gpt-4"
         
-        # Look for token counts
-        # Patterns like "X tokens used" or "Input: X, Output: Y"
-        
-        # Total tokens pattern
-        total_pattern = r"(\d+[\d,]*)\s*(?:total\s*)?tokens?\s*used"
-        match = re.search(total_pattern, output, re.IGNORECASE)
+        # Total tokens
+        match = _TOTAL_RE.search(output)
         if match:
             total = int(match.group(1).replace(",", ""))
             # Estimate split (typically more input than output in coding)
             input_tokens = int(total * 0.7)
             output_tokens = total - input_tokens
         
-        # Separate input/output patterns
-        input_pattern = r"(?:input|prompt)\s*(?:tokens?)?\s*:?\s*(\d+[\d,]*)"
-        match = re.search(input_pattern, output, re.IGNORECASE)
+        # Separate input/output counts
+        match = _INPUT_RE.search(output)
         if match:
             input_tokens = int(match.group(1).replace(",", ""))
         
-        output_pattern = r"(?:output|completion)\s*(?:tokens?)?\s*:?\s*(\d+[\d,]*)"
-        match = re.search(output_pattern, output, re.IGNORECASE)
+        match = _OUTPUT_RE.search(output)
         if match:
             output_tokens = int(match.group(1).replace(",", ""))
         
         # Usage percentage
-        pct_pattern = r"(\d+(?:\.\d+)?)\s*%\s*(?:used|of)"
-        match = re.search(pct_pattern, output, re.IGNORECASE)
+        match = _PCT_RE.search(output)
         if match:
             used_pct = float(match.group(1))
         
         # Limit
-        limit_pattern = r"limit\s*:?\s*(\d+[\d,]*)"
-        match = re.search(limit_pattern, output, re.IGNORECASE)
+        match = _LIMIT_RE.search(output)
         if match:
             limit_tokens = int(match.group(1).replace(",", ""))
         
         # Model detection
-        if "gpt-4o" in output.lower():
-            model = "gpt-4o"
-        elif "gpt-4-turbo" in output.lower():
-            model = "gpt-4-turbo"
-        elif "gpt-4" in output.lower():
-            model = "gpt-4"
-        elif "gpt-3.5" in output.lower():
-            model = "gpt-3.5-turbo"
+        match = _MODEL_RE.search(output)
+        if match:
+            model = _MODEL_NAMES[match.group(1).lower()]
         
         if input_tokens or output_tokens or used_pct:
             return TokenUsagePoint(
@@ -152,10 +229,7 @@ class CodexCollector(BaseCollector):
                 output_tokens=output_tokens,
                 cost_usd=0.0,  # Subscription-based
                 timestamp=datetime.now(timezone.utc),
-                tags={
-                    "source": "codex-cli",
-                    "subscription": "chatgpt-plus"
-                },
+                tags=_CODEX_TAGS,
                 fields={
                     "usage_percent": used_pct,
                     "limit_tokens": limit_tokens
@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     influxdb_token: str = Field(default="tokendash-super-secret-token")
     influxdb_org: str = Field(default="tokendash")
     influxdb_bucket: str = Field(default="tokens")
+    influxdb_batch_size: int = Field(default=5000, description="Points per batched write")
+    influxdb_flush_interval: int = Field(default=5000, description="Max time a point waits before being flushed, in ms")
     
     # API Keys
     openai_api_key: Optional[str] = Field(default=None)
@@ -24,6 +26,7 @@ class Settings(BaseSettings):
     
     # Collection settings
     collect_interval: int = Field(default=300, description="Collection interval in seconds")
+    collector_timeout: int = Field(default=60, description="Max time one collector may run per cycle, in seconds")
     
     # Pricing (USD per 1M tokens) - can be overridden via env
     openai_gpt4_input_price: float = Field(default=2.50)
@@ -3,9 +3,10 @@
 import asyncio
 import signal
 import sys
-from datetime import datetime, timezone
+from typing import Optional
 import structlog
 
+from .base import shutdown as shutdown_influx
 from .config import settings
 from .openai_collector import OpenAICollector
 from .anthropic_collector import AnthropicCollector
@@ -46,41 +47,72 @@ class CollectorOrchestrator:
             ClaudeCodeCollector(),
             CodexCollector(),
         ]
-        self.running = True
+        # Created in run() so it belongs to the running event loop
+        self._stop_event: Optional[asyncio.Event] = None
         self.log = logger.bind(component="orchestrator")
     
     def _setup_signal_handlers(self):
         """Setup graceful shutdown handlers."""
-        def handle_shutdown(signum, frame):
+        loop = asyncio.get_running_loop()
+        
+        def handle_shutdown(signum):
             self.log.info("Shutdown signal received", signal=signum)
-            self.running = False
+            self._stop_event.set()
         
-        signal.signal(signal.SIGTERM, handle_shutdown)
-        signal.signal(signal.SIGINT, handle_shutdown)
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, handle_shutdown, signum)
+            except NotImplementedError:
+                # Windows event loops don't support add_signal_handler
+                signal.signal(
+                    signum,
+                    lambda signum, frame: loop.call_soon_threadsafe(handle_shutdown, signum)
+                )
+    
+    async def _wait(self, seconds: float) -> None:
+        """Sleep for up to `seconds`, returning early on shutdown."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _run_one(self, collector) -> None:
+        """Run one collector, bounded by the collector_timeout setting."""
+        try:
+            # Hard deadline so one hung source can't stall a cycle
+            async with asyncio.timeout(settings.collector_timeout):
+                await collector.run()
+        except TimeoutError:
+            self.log.error(
+                "Collector timed out",
+                collector=collector.name,
+                timeout_seconds=settings.collector_timeout
+            )
+        except Exception as e:
+            self.log.error(
+                "Collector failed",
+                collector=collector.name,
+                error=str(e)
+            )
     
     async def run_collection_cycle(self):
         """Run a single collection cycle for all collectors."""
         self.log.info("Starting collection cycle")
-        start_time = datetime.now(timezone.utc)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
         
-        # Run all collectors concurrently
-        tasks = [collector.run() for collector in self.collectors]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Run all collectors concurrently. _run_one() never raises, so one
+        # failing collector doesn't cancel the others in the group.
+        async with asyncio.TaskGroup() as tg:
+            for collector in self.collectors:
+                tg.create_task(self._run_one(collector), name=collector.name)
         
-        # Log any exceptions
-        for collector, result in zip(self.collectors, results):
-            if isinstance(result, Exception):
-                self.log.error(
-                    "Collector failed",
-                    collector=collector.name,
-                    error=str(result)
-                )
-        
-        elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
+        elapsed = loop.time() - start
         self.log.info("Collection cycle complete", elapsed_seconds=round(elapsed, 2))
     
     async def run(self):
         """Main run loop."""
+        self._stop_event = asyncio.Event()
         self._setup_signal_handlers()
         
         self.log.info(
@@ -98,7 +130,7 @@ class CollectorOrchestrator:
                 configured=configured
             )
         
-        while self.running:
+        while not self._stop_event.is_set():
             try:
                 await self.run_collection_cycle()
                 
@@ -108,24 +140,27 @@ class CollectorOrchestrator:
                     seconds=settings.collect_interval
                 )
                 
-                # Use small sleep intervals to allow for graceful shutdown
-                for _ in range(settings.collect_interval):
-                    if not self.running:
-                        break
-                    await asyncio.sleep(1)
+                # Wakes up immediately when a shutdown signal sets the event
+                await self._wait(settings.collect_interval)
                     
             except Exception as e:
                 self.log.error("Error in main loop", error=str(e))
-                await asyncio.sleep(10)  # Brief pause before retry
+                await self._wait(10)  # Brief pause before retry
         
         # Cleanup
         self.log.info("Shutting down collectors")
         for collector in self.collectors:
             try:
-                collector.close()
+                await collector.aclose()
             except:
                 pass
         
+        # Flush buffered points to InfluxDB
+        try:
+            shutdown_influx()
+        except Exception as e:
+            self.log.error("Failed to flush InfluxDB writes", error=str(e))
+        
         self.log.info("Shutdown complete")
 
 
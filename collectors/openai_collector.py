@@ -1,12 +1,57 @@
 """OpenAI API usage collector."""
 
+import re
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, List, Optional, Tuple
 import httpx
+import orjson
 
-from .base import BaseCollector, TokenUsagePoint
+from .base import BaseCollector, TokenUsagePoint, parse_iso_timestamp
 from .config import settings
 
+_API_TAGS = MappingProxyType({"source": "api"})
+_MODEL_VERSION_RE = re.compile(r"-\d{4}-\d{2}-\d{2}$")
+
+
+def _first(item: dict, keys: Tuple[str, ...], default: Any = 0) -> Any:
+    """Value of the first key present with a non-None value, else default."""
+    for key in keys:
+        value = item.get(key)
+        if value is not None:
+            return value
+    return default
+
+
+@lru_cache(maxsize=256)
+def _resolve_openai_pricing(model: str) -> Optional[dict]:
+    """Resolve pricing for a model name, or None if the model is unknown."""
+    pricing_table = OpenAICollector.MODELS_PRICING
+    
+    # Try exact match first, then again without a dated snapshot suffix
+    if model in pricing_table:
+        return pricing_table[model]
+    stem = _MODEL_VERSION_RE.sub("", model)
+    if stem in pricing_table:
+        return pricing_table[stem]
+    
+    # Longest prefix wins, so gpt-4o-* is not priced as gpt-4
+    match = OpenAICollector.PRICING_PREFIX_RE.match(stem)
+    if match:
+        return pricing_table[match.group(0)]
+    
+    return None
+
+
+@lru_cache(maxsize=128)
+def _pricing_for(model: str) -> Optional[Tuple[float, float]]:
+    """(input, output) price per token, or None if the model is unknown."""
+    pricing = _resolve_openai_pricing(model)
+    if pricing is None:
+        return None
+    return pricing["input"] / 1_000_000, pricing["output"] / 1_000_000
+
 
 class OpenAICollector(BaseCollector):
     """Collects usage data from OpenAI API."""
@@ -27,6 +72,11 @@ class OpenAICollector(BaseCollector):
         "whisper-1": {"input": 0.0, "output": 0.0},  # Priced per minute
         "tts-1": {"input": 0.0, "output": 0.0},  # Priced per character
     }
+    PRICING_PREFIXES = tuple(sorted(MODELS_PRICING, key=len, reverse=True))
+    # Alternation is tried left to right, so longest-first ordering matters
+    PRICING_PREFIX_RE = re.compile("|".join(map(re.escape, PRICING_PREFIXES)))
+    DEFAULT_PRICING = {"input": 1.0, "output": 2.0}
+    DEFAULT_TOKEN_PRICING = (DEFAULT_PRICING["input"] / 1_000_000, DEFAULT_PRICING["output"] / 1_000_000)
     
     def is_configured(self) -> bool:
         """Check if OpenAI API key is configured."""
@@ -34,68 +84,65 @@ class OpenAICollector(BaseCollector):
     
     def get_model_pricing(self, model: str) -> dict:
         """Get pricing for a model, with fallback for unknown models."""
-        # Try exact match first
-        if model in self.MODELS_PRICING:
-            return self.MODELS_PRICING[model]
-        
-        # Try prefix matching for versioned models
-        for known_model, pricing in self.MODELS_PRICING.items():
-            if model.startswith(known_model):
-                return pricing
+        pricing = _resolve_openai_pricing(model)
+        if pricing is not None:
+            return pricing
         
         # Default fallback
         self.log.warning("Unknown model, using default pricing", model=model)
-        return {"input": 1.0, "output": 2.0}
+        return self.DEFAULT_PRICING
     
     def calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
         """Calculate cost in USD for token usage."""
-        pricing = self.get_model_pricing(model)
-        input_cost = (input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        return round(input_cost + output_cost, 6)
+        prices = _pricing_for(model)
+        if prices is None:
+            self.log.warning("Unknown model, using default pricing", model=model)
+            prices = self.DEFAULT_TOKEN_PRICING
+        input_price, output_price = prices
+        return round(input_tokens * input_price + output_tokens * output_price, 6)
     
     async def collect(self) -> List[TokenUsagePoint]:
         """Collect usage data from OpenAI API."""
         points = []
         
-        async with httpx.AsyncClient() as client:
-            # Try the usage endpoint
-            try:
-                # Get usage for today and yesterday
-                today = datetime.now(timezone.utc).date()
-                yesterday = today - timedelta(days=1)
-                
-                # OpenAI usage API requires date range
-                response = await client.get(
-                    f"{self.USAGE_URL}",
-                    headers={
-                        "Authorization": f"Bearer {settings.openai_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    params={
-                        "date": today.isoformat()
-                    },
-                    timeout=30.0
+        client = self.http
+        # Try the usage endpoint
+        try:
+            # Get usage for today and yesterday
+            today = datetime.now(timezone.utc).date()
+            yesterday = today - timedelta(days=1)
+            
+            # OpenAI usage API requires date range
+            response = await client.get(
+                f"{self.USAGE_URL}",
+                headers={
+                    "Authorization": f"Bearer {settings.openai_api_key}",
+                    "Content-Type": "application/json"
+                },
+                params={
+                    "date": today.isoformat()
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                points.extend(self._parse_usage_response(data))
+            elif response.status_code == 404:
+                # Try alternative endpoint
+                self.log.info("Usage endpoint not available, trying dashboard API")
+                points.extend(await self._collect_from_dashboard(client))
+            else:
+                self.log.warning(
+                    "OpenAI API error",
+                    status=response.status_code,
+                    body=response.text[:500]
                 )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    points.extend(self._parse_usage_response(data))
-                elif response.status_code == 404:
-                    # Try alternative endpoint
-                    self.log.info("Usage endpoint not available, trying dashboard API")
-                    points.extend(await self._collect_from_dashboard(client))
-                else:
-                    self.log.warning(
-                        "OpenAI API error",
-                        status=response.status_code,
-                        body=response.text[:500]
-                    )
-                    
-            except httpx.TimeoutException:
-                self.log.error("OpenAI API timeout")
-            except Exception as e:
-                self.log.error("OpenAI collection error", error=str(e))
+        except httpx.TimeoutException:
+            self.log.error("OpenAI API timeout")
+        except Exception as e:
+            self.log.error("OpenAI collection error", error=str(e))
         
         return points
     
@@ -107,15 +154,15 @@ class OpenAICollector(BaseCollector):
         usage_data = data.get("data", []) or data.get("usage", [])
         
         for item in usage_data:
-            model = item.get("model", item.get("snapshot_id", "unknown"))
-            input_tokens = item.get("n_context_tokens_total", 0) or item.get("prompt_tokens", 0)
-            output_tokens = item.get("n_generated_tokens_total", 0) or item.get("completion_tokens", 0)
+            model = _first(item, ("model", "snapshot_id"), "unknown")
+            input_tokens = _first(item, ("n_context_tokens_total", "prompt_tokens"))
+            output_tokens = _first(item, ("n_generated_tokens_total", "completion_tokens"))
             
             # Parse timestamp
-            timestamp_str = item.get("aggregation_timestamp") or item.get("timestamp")
+            timestamp_str = _first(item, ("aggregation_timestamp", "timestamp"), None)
             if timestamp_str:
                 try:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+                    timestamp = parse_iso_timestamp(timestamp_str)
                 except:
                     timestamp = datetime.now(timezone.utc)
             else:
@@ -130,7 +177,7 @@ class OpenAICollector(BaseCollector):
                 output_tokens=output_tokens,
                 cost_usd=cost,
                 timestamp=timestamp,
-                tags={"source": "api"}
+                tags=_API_TAGS
             ))
         
         return points
@@ -3,8 +3,9 @@
 from datetime import datetime, timezone
 from typing import List
 import httpx
+import orjson
 
-from .base import BaseCollector, TokenUsagePoint
+from .base import BaseCollector, TokenUsagePoint, parse_iso_timestamp
 from .config import settings
 
 
@@ -22,43 +23,42 @@ class OpenClawCollector(BaseCollector):
         if not self.is_configured():
             return points
         
-        async with httpx.AsyncClient() as client:
-            try:
-                # Get session list with usage stats
-                response = await client.post(
-                    f"{settings.openclaw_gateway_url}/api/sessions/list",
-                    headers={
-                        "Authorization": f"Bearer {settings.openclaw_gateway_token}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "limit": 50,
-                        "messageLimit": 0,
-                        "activeMinutes": 1440  # Last 24 hours
-                    },
-                    timeout=30.0
+        try:
+            # Get session list with usage stats
+            response = await self.http.post(
+                f"{settings.openclaw_gateway_url}/api/sessions/list",
+                headers={
+                    "Authorization": f"Bearer {settings.openclaw_gateway_token}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "limit": 50,
+                    "messageLimit": 0,
+                    "activeMinutes": 1440  # Last 24 hours
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                sessions = data.get("sessions", [])
+                
+                for session in sessions:
+                    session_points = self._parse_session(session)
+                    points.extend(session_points)
+            else:
+                self.log.warning(
+                    "OpenClaw API error",
+                    status=response.status_code,
+                    body=response.text[:200]
                 )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    sessions = data.get("sessions", [])
-                    
-                    for session in sessions:
-                        session_points = self._parse_session(session)
-                        points.extend(session_points)
-                else:
-                    self.log.warning(
-                        "OpenClaw API error",
-                        status=response.status_code,
-                        body=response.text[:200]
-                    )
-                    
-            except httpx.TimeoutException:
-                self.log.error("OpenClaw Gateway timeout")
-            except httpx.ConnectError:
-                self.log.debug("OpenClaw Gateway not reachable")
-            except Exception as e:
-                self.log.error("OpenClaw collection error", error=str(e))
+        except httpx.TimeoutException:
+            self.log.error("OpenClaw Gateway timeout")
+        except httpx.ConnectError:
+            self.log.debug("OpenClaw Gateway not reachable")
+        except Exception as e:
+            self.log.error("OpenClaw collection error", error=str(e))
         
         return points
     
@@ -95,7 +95,7 @@ class OpenClawCollector(BaseCollector):
                 if isinstance(updated_at, (int, float)):
                     timestamp = datetime.fromtimestamp(updated_at / 1000, tz=timezone.utc)
                 else:
-                    timestamp = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
+                    timestamp = parse_iso_timestamp(updated_at)
             except:
                 timestamp = datetime.now(timezone.utc)
         else:
@@ -10,17 +10,62 @@ Usage:
 
 import json
 import argparse
+import heapq
+import os
+import sys
+from array import array
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
+# orjson is optional; it is several times faster than the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Summary box borders
+BOX_TOP = "╔══════════════════════════════════════════════════════════════╗"
+BOX_MID = "╠══════════════════════════════════════════════════════════════╣"
+BOX_BOT = "╚══════════════════════════════════════════════════════════════╝"
+
+# Below this many session files, parse serially
+PARALLEL_MIN_FILES = 4
+
+# Raw bytes present in every assistant entry, compact or spaced
+ASSISTANT_MARKER = b'"type":"assistant"'
+ASSISTANT_MARKER_SPACED = b'"type": "assistant"'
+
+# Date suffixes like -20251101
+_DATE_SUFFIX_RE = re.compile(r'-\d{8}$')
+
+# API pricing in USD per 1M tokens: (input, output, cache read, cache write)
+_PRICING: Dict[str, Tuple[float, float, float, float]] = {
+    "claude-opus-4-5": (15.00, 75.00, 1.875, 18.75),
+    "claude-sonnet-4": (3.00, 15.00, 0.30, 3.75),
+    "claude-3-5-sonnet": (3.00, 15.00, 0.30, 3.75),
+    "claude-3-opus": (15.00, 75.00, 1.875, 18.75),
+}
+
+# Session files smaller than this are read in one call
+EAGER_READ_LIMIT = 16 * 1024 * 1024
+
+# Parsed sessions by path, with the (mtime_ns, size, detailed) they were parsed at
+_session_cache: Dict[str, Tuple[Tuple[int, int, bool], Optional[Dict[str, Any]]]] = {}
+
+
+@lru_cache(maxsize=64)
 def normalize_model_name(model: str) -> str:
     """Remove date suffixes from model names."""
-    return re.sub(r'-\d{8}$', '', model).lower()
+    return _DATE_SUFFIX_RE.sub('', model).lower()
 
 
+@lru_cache(maxsize=1024)
 def calculate_hypothetical_cost(
     model: str,
     input_tokens: int,
@@ -29,128 +74,248 @@ def calculate_hypothetical_cost(
     cache_write: int = 0
 ) -> float:
     """Calculate what this usage would cost on API pricing."""
-    pricing = {
-        "claude-opus-4-5": {"input": 15.00, "output": 75.00, "cache_read": 1.875, "cache_write": 18.75},
-        "claude-sonnet-4": {"input": 3.00, "output": 15.00, "cache_read": 0.30, "cache_write": 3.75},
-        "claude-3-5-sonnet": {"input": 3.00, "output": 15.00, "cache_read": 0.30, "cache_write": 3.75},
-        "claude-3-opus": {"input": 15.00, "output": 75.00, "cache_read": 1.875, "cache_write": 18.75},
-    }
-    
     model_lower = normalize_model_name(model)
-    p = pricing.get(model_lower, pricing["claude-opus-4-5"])
+    input_price, output_price, cache_read_price, cache_write_price = _PRICING.get(
+        model_lower, _PRICING["claude-opus-4-5"]
+    )
     
     return round(
-        (input_tokens / 1_000_000) * p["input"] +
-        (output_tokens / 1_000_000) * p["output"] +
-        (cache_read / 1_000_000) * p["cache_read"] +
-        (cache_write / 1_000_000) * p["cache_write"],
+        (
+            input_tokens * input_price +
+            output_tokens * output_price +
+            cache_read * cache_read_price +
+            cache_write * cache_write_price
+        ) / 1_000_000,
         4
     )
 
 
+@lru_cache(maxsize=4)
+def _load_stats_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse stats-cache.json; the mtime and size only key the cache."""
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+
 def get_stats_cache() -> Dict[str, Any]:
-    """Read stats-cache.json."""
+    """Read stats-cache.json, reparsing only when the file has changed."""
     path = Path.home() / ".claude" / "stats-cache.json"
-    if not path.exists():
+    try:
+        st = path.stat()
+    except FileNotFoundError:
         return {}
     
-    with open(path) as f:
-        return json.load(f)
+    return _load_stats_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _scan_jsonl(root: str) -> Iterator[str]:
+    """Yield paths of all *.jsonl files under root.
+    
+    Symlinked directories are not descended into, but symlinked files are
+    yielded, as with Path.rglob. Unreadable or vanished directories are
+    skipped.
+    """
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _scan_jsonl(entry.path)
+                elif entry.name.endswith(".jsonl") and entry.is_file():
+                    yield entry.path
+    except OSError:
+        return
+
+
+def _parse_session_file(
+    jsonl_path: str,
+    projects_parent: str,
+    detailed: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Parse one session JSONL file, or return None if it has no usage.
+    
+    Per-message records are only kept when detailed is set; otherwise
+    just their count is returned as message_count.
+    """
+    total_input = total_output = total_cache_read = total_cache_write = 0
+    message_count = tool_calls = thinking_blocks = 0
+    first_timestamp = None
+    # Per-message values for detailed output, buffered column-wise and
+    # turned into records once at the end
+    timestamps = []
+    models = []
+    input_buf = array("q")
+    output_buf = array("q")
+    cache_read_buf = array("q")
+    cache_write_buf = array("q")
+    
+    # One bulk read and split beats per-line text decoding; both
+    # decoders accept the raw bytes. Huge files are streamed line by
+    # line instead so memory stays bounded.
+    with open(jsonl_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < EAGER_READ_LIMIT:
+            lines = f.read().splitlines()
+        else:
+            lines = f
+        for line in lines:
+            # Cheap byte test before decoding; anything that slips through
+            # is still filtered by the type check below
+            if ASSISTANT_MARKER not in line and ASSISTANT_MARKER_SPACED not in line:
+                continue
+            try:
+                entry = _loads(line)
+            except ValueError:  # JSONDecodeError from either decoder
+                continue
+            
+            if entry.get("type") != "assistant":
+                continue
+            
+            message = entry.get("message", {})
+            usage = message.get("usage")
+            if not usage:
+                continue
+            
+            input_tok = usage.get("input_tokens", 0)
+            output_tok = usage.get("output_tokens", 0)
+            cache_read = usage.get("cache_read_input_tokens", 0)
+            cache_write = usage.get("cache_creation_input_tokens", 0)
+            
+            # Running totals live in locals and are written back once
+            if not message_count:
+                first_timestamp = entry.get("timestamp")
+            message_count += 1
+            total_input += input_tok
+            total_output += output_tok
+            total_cache_read += cache_read
+            total_cache_write += cache_write
+            
+            if detailed:
+                timestamps.append(entry.get("timestamp"))
+                models.append(message.get("model"))
+                input_buf.append(input_tok)
+                output_buf.append(output_tok)
+                cache_read_buf.append(cache_read)
+                cache_write_buf.append(cache_write)
+            
+            # Check content types, looking each block's type up once
+            content = message.get("content")
+            if isinstance(content, list):
+                for item in content:
+                    item_type = item.get("type") if isinstance(item, dict) else None
+                    if item_type == "tool_use":
+                        tool_calls += 1
+                    elif item_type == "thinking":
+                        thinking_blocks += 1
+    
+    if not message_count:
+        return None
+    
+    session_data = {
+        "session_id": os.path.splitext(os.path.basename(jsonl_path))[0],
+        "path": os.path.relpath(jsonl_path, projects_parent),
+        "first_timestamp": first_timestamp,
+    }
+    if detailed:
+        session_data["messages"] = [
+            {
+                "timestamp": timestamp,
+                "model": model,
+                "input": input_tok,
+                "output": output_tok,
+                "cache_read": cache_read,
+                "cache_write": cache_write,
+            }
+            for timestamp, model, input_tok, output_tok, cache_read, cache_write in zip(
+                timestamps, models, input_buf, output_buf, cache_read_buf, cache_write_buf
+            )
+        ]
+    else:
+        session_data["message_count"] = message_count
+    session_data.update({
+        "total_input": total_input,
+        "total_output": total_output,
+        "total_cache_read": total_cache_read,
+        "total_cache_write": total_cache_write,
+        "tool_calls": tool_calls,
+        "thinking_blocks": thinking_blocks,
+    })
+    return session_data
 
 
-def get_session_details() -> List[Dict[str, Any]]:
-    """Parse all session JSONL files for detailed usage."""
+def get_session_details(detailed: bool = False) -> List[Dict[str, Any]]:
+    """Parse all session JSONL files for usage.
+    
+    With detailed set, each session includes its per-message records.
+    """
     projects_dir = Path.home() / ".claude" / "projects"
     if not projects_dir.exists():
         return []
     
-    sessions = []
-    
-    for jsonl_path in projects_dir.rglob("*.jsonl"):
-        session_data = {
-            "session_id": jsonl_path.stem,
-            "path": str(jsonl_path.relative_to(projects_dir.parent)),
-            "messages": [],
-            "total_input": 0,
-            "total_output": 0,
-            "total_cache_read": 0,
-            "total_cache_write": 0,
-            "tool_calls": 0,
-            "thinking_blocks": 0,
-        }
-        
-        with open(jsonl_path) as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                
-                if entry.get("type") != "assistant":
-                    continue
-                
-                message = entry.get("message", {})
-                usage = message.get("usage")
-                if not usage:
-                    continue
-                
-                input_tok = usage.get("input_tokens", 0)
-                output_tok = usage.get("output_tokens", 0)
-                cache_read = usage.get("cache_read_input_tokens", 0)
-                cache_write = usage.get("cache_creation_input_tokens", 0)
-                
-                session_data["total_input"] += input_tok
-                session_data["total_output"] += output_tok
-                session_data["total_cache_read"] += cache_read
-                session_data["total_cache_write"] += cache_write
-                
-                # Check content types
-                content = message.get("content", [])
-                for item in content if isinstance(content, list) else []:
-                    if isinstance(item, dict):
-                        if item.get("type") == "tool_use":
-                            session_data["tool_calls"] += 1
-                        if item.get("type") == "thinking":
-                            session_data["thinking_blocks"] += 1
-                
-                session_data["messages"].append({
-                    "timestamp": entry.get("timestamp"),
-                    "model": message.get("model"),
-                    "input": input_tok,
-                    "output": output_tok,
-                    "cache_read": cache_read,
-                    "cache_write": cache_write,
-                })
-        
-        if session_data["messages"]:
-            sessions.append(session_data)
+    global _session_cache
+    projects_parent = str(projects_dir.parent)
+    paths = list(_scan_jsonl(str(projects_dir)))
+    
+    # Only files whose mtime or size changed since the last call are parsed
+    cache = {}
+    stale = []
+    for path in paths:
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size, detailed)
+        cached = _session_cache.get(path)
+        if cached is not None and cached[0] == key:
+            cache[path] = cached
+        else:
+            stale.append((path, key))
+    
+    # Files are independent, so decode them on all cores; for a handful
+    # of files the pool start-up costs more than it saves
+    stale_paths = [path for path, _ in stale]
+    if len(stale_paths) < PARALLEL_MIN_FILES:
+        results = [
+            _parse_session_file(path, projects_parent, detailed)
+            for path in stale_paths
+        ]
+    else:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(
+                _parse_session_file,
+                stale_paths,
+                [projects_parent] * len(stale_paths),
+                [detailed] * len(stale_paths),
+                chunksize=8
+            ))
     
-    return sessions
+    for (path, key), session in zip(stale, results):
+        cache[path] = (key, session)
+    # Rebuilt each call, so deleted files drop out
+    _session_cache = cache
+    
+    return [session for session in (cache[path][1] for path in paths) if session]
 
 
 def format_number(n: int) -> str:
     """Format large numbers with commas."""
-    return f"{n:,}"
+    return format(n, ",")
 
 
 def print_summary(stats: Dict, sessions: List[Dict], detailed: bool = False):
     """Print formatted usage summary."""
-    print("\n╔══════════════════════════════════════════════════════════════╗")
-    print("║              🤖 Claude Code Usage Summary                    ║")
-    print("╠══════════════════════════════════════════════════════════════╣")
+    # Collected and written in one call instead of a print() per line
+    lines = []
+    lines.append("\n" + BOX_TOP)
+    lines.append("║              🤖 Claude Code Usage Summary                    ║")
+    lines.append(BOX_MID)
     
     if not stats:
-        print("║  ⚠️  No stats-cache.json found                               ║")
-        print("║  Run Claude Code to generate usage data                      ║")
-        print("╚══════════════════════════════════════════════════════════════╝")
+        lines.append("║  ⚠️  No stats-cache.json found                               ║")
+        lines.append("║  Run Claude Code to generate usage data                      ║")
+        lines.append(BOX_BOT)
+        sys.stdout.write("\n".join(lines) + "\n")
         return
     
-    print(f"║  📅 First session: {stats.get('firstSessionDate', 'Unknown')[:10]:<35}║")
-    print(f"║  💬 Total sessions: {stats.get('totalSessions', 0):<34}║")
-    print(f"║  📝 Total messages: {stats.get('totalMessages', 0):<34}║")
-    print("╠══════════════════════════════════════════════════════════════╣")
+    lines.append(f"║  📅 First session: {stats.get('firstSessionDate', 'Unknown')[:10]:<35}║")
+    lines.append(f"║  💬 Total sessions: {stats.get('totalSessions', 0):<34}║")
+    lines.append(f"║  📝 Total messages: {stats.get('totalMessages', 0):<34}║")
+    lines.append(BOX_MID)
     
     model_usage = stats.get("modelUsage", {})
     total_cost = 0.0
@@ -164,36 +329,38 @@ def print_summary(stats: Dict, sessions: List[Dict], detailed: bool = False):
         cost = calculate_hypothetical_cost(model, input_tok, output_tok, cache_read, cache_write)
         total_cost += cost
         
-        print(f"║  Model: {normalize_model_name(model):<48}║")
-        print(f"║    Input tokens:      {format_number(input_tok):>32}║")
-        print(f"║    Output tokens:     {format_number(output_tok):>32}║")
-        print(f"║    Cache read:        {format_number(cache_read):>32}║")
-        print(f"║    Cache write:       {format_number(cache_write):>32}║")
-        print(f"║    Hypothetical cost: ${cost:>30.2f}║")
-    
-    print("╠══════════════════════════════════════════════════════════════╣")
-    print(f"║  💵 Total hypothetical cost: ${total_cost:>24.2f}       ║")
-    print(f"║  💰 Actual cost (Claude Max): ${'0.00 (subscription)':>25}    ║")
-    print("╚══════════════════════════════════════════════════════════════╝")
+        lines.append(f"║  Model: {normalize_model_name(model):<48}║")
+        lines.append(f"║    Input tokens:      {format_number(input_tok).rjust(32)}║")
+        lines.append(f"║    Output tokens:     {format_number(output_tok).rjust(32)}║")
+        lines.append(f"║    Cache read:        {format_number(cache_read).rjust(32)}║")
+        lines.append(f"║    Cache write:       {format_number(cache_write).rjust(32)}║")
+        lines.append(f"║    Hypothetical cost: ${cost:>30.2f}║")
+    
+    lines.append(BOX_MID)
+    lines.append(f"║  💵 Total hypothetical cost: ${total_cost:>24.2f}       ║")
+    lines.append(f"║  💰 Actual cost (Claude Max): ${'0.00 (subscription)':>25}    ║")
+    lines.append(BOX_BOT)
     
     # Daily activity
     daily = stats.get("dailyActivity", [])
     if daily:
-        print("\n📊 Recent Daily Activity:")
-        print("─" * 50)
-        for day in sorted(daily, key=lambda x: x.get("date", ""), reverse=True)[:7]:
-            print(f"  {day.get('date', 'Unknown')}: {day.get('messageCount', 0)} messages, {day.get('sessionCount', 0)} sessions")
+        lines.append("\n📊 Recent Daily Activity:")
+        lines.append("─" * 50)
+        for day in heapq.nlargest(7, daily, key=lambda x: x.get("date", "")):
+            lines.append(f"  {day.get('date', 'Unknown')}: {day.get('messageCount', 0)} messages, {day.get('sessionCount', 0)} sessions")
     
     # Session details
     if detailed and sessions:
-        print("\n📁 Session Details:")
-        print("─" * 60)
-        for sess in sorted(sessions, key=lambda x: x.get("messages", [{}])[0].get("timestamp", "") if x.get("messages") else "", reverse=True)[:10]:
-            msg_count = len(sess.get("messages", []))
-            print(f"\n  Session: {sess['session_id'][:20]}...")
-            print(f"    Messages: {msg_count}, Tools: {sess['tool_calls']}, Thinking: {sess['thinking_blocks']}")
-            print(f"    Tokens: {format_number(sess['total_input'])} in / {format_number(sess['total_output'])} out")
-            print(f"    Cache: {format_number(sess['total_cache_read'])} read / {format_number(sess['total_cache_write'])} write")
+        lines.append("\n📁 Session Details:")
+        lines.append("─" * 60)
+        for sess in heapq.nlargest(10, sessions, key=lambda x: x.get("first_timestamp") or ""):
+            msg_count = sess.get("message_count", len(sess.get("messages", [])))
+            lines.append(f"\n  Session: {sess['session_id'][:20]}...")
+            lines.append(f"    Messages: {msg_count}, Tools: {sess['tool_calls']}, Thinking: {sess['thinking_blocks']}")
+            lines.append(f"    Tokens: {format_number(sess['total_input'])} in / {format_number(sess['total_output'])} out")
+            lines.append(f"    Cache: {format_number(sess['total_cache_read'])} read / {format_number(sess['total_cache_write'])} write")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -203,7 +370,12 @@ def main():
     args = parser.parse_args()
     
     stats = get_stats_cache()
-    sessions = get_session_details()
+    # The plain summary never shows sessions, so don't parse them at all;
+    # only the JSON output needs per-message records
+    if args.json or args.detailed:
+        sessions = get_session_details(detailed=args.json)
+    else:
+        sessions = []
     
     if args.json:
         output = {
@@ -216,7 +388,13 @@ def main():
                 "session_files": len(sessions),
             }
         }
-        print(json.dumps(output, indent=2, default=str))
+        if orjson is not None:
+            # Bytes straight to stdout, skipping a decode round trip
+            sys.stdout.buffer.write(
+                orjson.dumps(output, default=str, option=orjson.OPT_INDENT_2) + b"\n"
+            )
+        else:
+            print(json.dumps(output, indent=2, default=str))
     else:
         print_summary(stats, sessions, detailed=args.detailed)
 